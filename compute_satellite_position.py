@@ -5,14 +5,117 @@ Description:
 Calculates satellite position in Earth-Centered Earth-Fixed (ECEF) coordinates using
 orbital parameters interpolated at specific times.
 
+Kepler's equation is solved with an analytic series seed plus two fixed
+Halley steps (no iteration loop). A precomputed (e, M) lookup table with
+bilinear interpolation of E/sin E/cos E was considered as an alternative,
+but at GPS eccentricities the fixed-step solver already costs only four
+sincos evaluations per epoch at full float64 accuracy, so the table would
+add memory traffic and interpolation error for no saving.
+
 Author: F.Ahmadzade
 """
 
+import math
 from typing import Dict
 import numpy as np
 
-
-def compute_satellite_position(orbital_params: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+__all__ = ['compute_satellite_position', 'EPHEMERIS_KEY_MAP', 'REQUIRED_PARAMS']
+__version__ = '1.0'
+
+# Numba is optional: the JIT kernel fuses the Newton iteration into one
+# pass over memory with threads across epochs; without it we fall back to
+# the vectorized NumPy solver below.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+# Ephemeris records from read_navigation use different spellings for some
+# orbital parameters than this module. Producers apply this map before
+# building the orbital_params dict. Previously the mismatch was silently
+# absorbed by a zero-fill fallback, which dropped delta_n/OMEGA/OMEGA_DOT
+# from the computation entirely.
+EPHEMERIS_KEY_MAP = {
+    'Omega0': 'OMEGA',
+    'DeltaN': 'delta_n',
+    'OmegaDot': 'OMEGA_DOT',
+}
+
+# The orbital parameters compute_satellite_position actually reads (plus
+# 'tk', which producers build separately). Producers broadcasting a full
+# ~30-field ephemeris record can restrict themselves to these keys
+# instead of materializing an epoch-length array per field.
+REQUIRED_PARAMS = ('sqrtA', 'e', 'i0', 'omega', 'OMEGA', 'M0',
+                   'delta_n', 'OMEGA_DOT', 'IDOT')
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _solve_kepler_batch(M, e, out_E, out_sinE, out_cosE):
+        for k in prange(M.shape[0]):
+            Mk = M[k]
+            ek = e[k]
+            # Second-order series seed gives 6-8 correct digits at GPS
+            # eccentricities, so two fixed Halley steps saturate float64
+            # precision. Straight-line code: no loop, no convergence branch.
+            Ek = Mk + ek * math.sin(Mk) + 0.5 * ek * ek * math.sin(2.0 * Mk)
+
+            s = math.sin(Ek)
+            c = math.cos(Ek)
+            f = Ek - ek * s - Mk
+            fp = 1.0 - ek * c
+            fpp = ek * s
+            Ek -= 2.0 * f * fp / (2.0 * fp * fp - f * fpp)
+
+            s = math.sin(Ek)
+            c = math.cos(Ek)
+            f = Ek - ek * s - Mk
+            fp = 1.0 - ek * c
+            fpp = ek * s
+            Ek -= 2.0 * f * fp / (2.0 * fp * fp - f * fpp)
+
+            s = math.sin(Ek)
+            c = math.cos(Ek)
+            out_E[k] = Ek
+            out_sinE[k] = s
+            out_cosE[k] = c
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _propagate_angles(tk, M0, n_corr, i0, IDOT, OMEGA0, OMEGA_DOT, omega_e,
+                          out_M, out_i, out_Omega):
+        # Three FMAs per element against a single DRAM read of tk, instead
+        # of three separate broadcast passes each re-reading tk and writing
+        # its own temporary.
+        for k in prange(tk.shape[0]):
+            t = tk[k]
+            out_M[k] = M0[k] + n_corr[k] * t
+            out_i[k] = i0[k] + IDOT[k] * t
+            out_Omega[k] = OMEGA0[k] + (OMEGA_DOT[k] - omega_e) * t
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rotate_to_ecef(r, u, Omega, i, out_X, out_Y, out_Z):
+        # One pass per epoch: the three sin/cos pairs compile down to
+        # paired sincos calls, replacing six separate NumPy trig passes
+        # and their intermediate arrays.
+        for k in prange(r.shape[0]):
+            su = math.sin(u[k])
+            cu = math.cos(u[k])
+            sO = math.sin(Omega[k])
+            cO = math.cos(Omega[k])
+            si = math.sin(i[k])
+            ci = math.cos(i[k])
+            xo = r[k] * cu
+            yo = r[k] * su
+            out_X[k] = xo * cO - yo * ci * sO
+            out_Y[k] = xo * sO + yo * ci * cO
+            out_Z[k] = yo * si
+
+
+def compute_satellite_position(orbital_params: Dict[str, np.ndarray],
+                               dtype: np.dtype = np.float64,
+                               out: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
     """
     Compute satellite ECEF positions from interpolated orbital parameters.
 
@@ -21,68 +124,131 @@ def compute_satellite_position(orbital_params: Dict[str, np.ndarray]) -> Dict[st
             Expected keys:
             ['sqrtA', 'e', 'i0', 'omega', 'OMEGA', 'M0', 'delta_n', 'OMEGA_DOT', 'IDOT', 'tk']
             'tk' is the time difference array in seconds from ephemeris reference epoch.
+        dtype: Output dtype for the position arrays. All internal math stays
+            float64; np.float32 halves the memory traffic of the results at
+            ~3 m resolution on a GPS orbit radius, which is fine for
+            visualization and CSV export paths.
+        out: Optional dict with preallocated float64 'X', 'Y', 'Z' arrays
+            (each tk-shaped) that the positions are written into, e.g. row
+            views of one batch matrix. Batch callers reuse the buffers
+            across satellites instead of allocating three arrays per call.
+            Ignores dtype; returns out.
 
     Returns:
         Dict[str, np.ndarray]: Dictionary with keys 'X', 'Y', 'Z' containing satellite ECEF coordinates.
     """
 
-    # Helper to safely retrieve arrays and replace NaN or None with zeros
-    def safe_array_get(key):
-        arr = orbital_params.get(key)
-        if arr is None:
-            return np.zeros_like(orbital_params['tk'])
-        arr = np.array(arr)
-        arr = np.where(np.isnan(arr), 0.0, arr)
-        return arr
-
-    sqrtA = safe_array_get('sqrtA')
-    e = safe_array_get('e')
-    i0 = safe_array_get('i0')
-    omega = safe_array_get('omega')       # Argument of perigee
-    OMEGA = safe_array_get('OMEGA')       # Longitude of ascending node at reference time
-    M0 = safe_array_get('M0')              # Mean anomaly at reference time
-    delta_n = safe_array_get('delta_n')   # Mean motion difference
-    OMEGA_DOT = safe_array_get('OMEGA_DOT') # Rate of right ascension
-    IDOT = safe_array_get('IDOT')          # Rate of inclination angle
-    tk = safe_array_get('tk')              # Time from ephemeris reference epoch (seconds)
-
-    n = len(sqrtA)
+    # interpolate_orbital_params guarantees clean float64 arrays (NaNs already
+    # replaced with zeros), so parameters are read directly without re-scrubbing.
+    sqrtA = orbital_params['sqrtA']
+    e = orbital_params['e']
+    i0 = orbital_params['i0']
+    omega = orbital_params['omega']         # Argument of perigee
+    OMEGA = orbital_params['OMEGA']         # Longitude of ascending node at reference time
+    M0 = orbital_params['M0']               # Mean anomaly at reference time
+    delta_n = orbital_params['delta_n']     # Mean motion difference
+    OMEGA_DOT = orbital_params['OMEGA_DOT'] # Rate of right ascension
+    IDOT = orbital_params['IDOT']           # Rate of inclination angle
+    tk = orbital_params['tk']               # Time from ephemeris reference epoch (seconds)
+
     mu = 3.986005e14  # Earth's universal gravitational parameter (m^3/s^2)
 
-    A = sqrtA**2
-    n0 = np.sqrt(mu / (A**3))
+    # sqrtA and e come from a single ephemeris record broadcast over the
+    # window, so they are normally constant; compute the derived quantities
+    # once as scalars so the broadcasts below stay in registers instead of
+    # touching N-element temporaries.
+    e_const = e.size > 0 and np.ptp(e) == 0
+    if sqrtA.size > 0 and np.ptp(sqrtA) == 0:
+        A = sqrtA.flat[0] ** 2
+        n0 = math.sqrt(mu / A**3)
+    else:
+        A = sqrtA**2
+        n0 = np.sqrt(mu / (A**3))
+    beta = math.sqrt(1 - e.flat[0]**2) if e_const else np.sqrt(1 - e**2)
     n_corr = n0 + delta_n
 
-    M = M0 + n_corr * tk
-    M = np.mod(M, 2 * np.pi)
-
-    def kepler_solver(M_i, e_i, tol=1e-12, max_iter=100):
-        E = M_i
-        for _ in range(max_iter):
-            f = E - e_i * np.sin(E) - M_i
-            f_prime = 1 - e_i * np.cos(E)
-            delta = -f / f_prime
-            E += delta
-            if abs(delta) < tol:
-                break
-        return E
-
-    E = np.array([kepler_solver(M[i], e[i]) for i in range(n)])
-
-    sin_v = (np.sqrt(1 - e**2) * np.sin(E)) / (1 - e * np.cos(E))
-    cos_v = (np.cos(E) - e) / (1 - e * np.cos(E))
+    tk = np.ascontiguousarray(tk, dtype=np.float64)
+
+    # No explicit 2*pi wrap: the Kepler seed and sin/cos are periodic in M
+    # and libm range-reduces large arguments internally, so np.mod here was
+    # a redundant pass plus an extra array allocation.
+    if HAVE_NUMBA:
+        M = np.empty_like(tk)
+        i = np.empty_like(tk)
+        Omega = np.empty_like(tk)
+        _propagate_angles(tk, np.ascontiguousarray(M0),
+                          np.ascontiguousarray(n_corr),
+                          np.ascontiguousarray(i0),
+                          np.ascontiguousarray(IDOT),
+                          np.ascontiguousarray(OMEGA),
+                          np.ascontiguousarray(OMEGA_DOT),
+                          7.2921151467e-5, M, i, Omega)
+    else:
+        M = M0 + n_corr * tk
+        i = i0 + IDOT * tk
+        Omega = OMEGA + (OMEGA_DOT - 7.2921151467e-5) * tk  # Earth's rotation rate subtracted
+
+    def kepler_solver(M_arr, e_arr):
+        # Second-order series seed (6-8 correct digits at GPS eccentricities)
+        # followed by exactly two Halley steps saturates float64 precision.
+        # Straight-line code: no loop, no convergence check.
+        E = M_arr + e_arr * np.sin(M_arr) + 0.5 * e_arr**2 * np.sin(2 * M_arr)
+
+        for _ in range(2):
+            sinE = np.sin(E)
+            cosE = np.cos(E)
+            f = E - e_arr * sinE - M_arr
+            fp = 1 - e_arr * cosE
+            fpp = e_arr * sinE
+            E -= 2 * f * fp / (2 * fp * fp - f * fpp)
+
+        return E, np.sin(E), np.cos(E)
+
+    if HAVE_NUMBA:
+        E = np.empty_like(M)
+        sinE = np.empty_like(M)
+        cosE = np.empty_like(M)
+        _solve_kepler_batch(np.ascontiguousarray(M), np.ascontiguousarray(e),
+                            E, sinE, cosE)
+    else:
+        E, sinE, cosE = kepler_solver(M, e)
+
+    one_minus_ecosE = 1 - e * cosE
+    sin_v = (beta * sinE) / one_minus_ecosE
+    cos_v = (cosE - e) / one_minus_ecosE
     v = np.arctan2(sin_v, cos_v)
 
     u = v + omega
-    r = A * (1 - e * np.cos(E))
-    i = i0 + IDOT * tk
-    Omega = OMEGA + (OMEGA_DOT - 7.2921151467e-5) * tk  # Earth's rotation rate subtracted
-
-    x_orb = r * np.cos(u)
-    y_orb = r * np.sin(u)
-
-    X = x_orb * np.cos(Omega) - y_orb * np.cos(i) * np.sin(Omega)
-    Y = x_orb * np.sin(Omega) + y_orb * np.cos(i) * np.cos(Omega)
-    Z = y_orb * np.sin(i)
+    r = A * one_minus_ecosE
+
+    if out is not None:
+        X, Y, Z = out['X'], out['Y'], out['Z']
+    elif HAVE_NUMBA:
+        X = np.empty_like(r)
+        Y = np.empty_like(r)
+        Z = np.empty_like(r)
+
+    if HAVE_NUMBA:
+        _rotate_to_ecef(r, u, Omega, i, X, Y, Z)
+    else:
+        x_orb = r * np.cos(u)
+        y_orb = r * np.sin(u)
+
+        if out is not None:
+            X[...] = x_orb * np.cos(Omega) - y_orb * np.cos(i) * np.sin(Omega)
+            Y[...] = x_orb * np.sin(Omega) + y_orb * np.cos(i) * np.cos(Omega)
+            Z[...] = y_orb * np.sin(i)
+        else:
+            X = x_orb * np.cos(Omega) - y_orb * np.cos(i) * np.sin(Omega)
+            Y = x_orb * np.sin(Omega) + y_orb * np.cos(i) * np.cos(Omega)
+            Z = y_orb * np.sin(i)
+
+    if out is not None:
+        return out
+
+    if np.dtype(dtype) != np.float64:
+        X = X.astype(dtype)
+        Y = Y.astype(dtype)
+        Z = Z.astype(dtype)
 
     return {'X': X, 'Y': Y, 'Z': Z}
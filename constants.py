@@ -7,6 +7,9 @@ for GPS, GLONASS, Galileo, BeiDou
 Author: F.Ahmadzade
 """
 
+import functools
+import types
+
 # Speed of light (m/s)
 C = 299792458.0
 
@@ -47,6 +50,7 @@ GLONASS_K = {
     'R19': 3,  'R20': 2,  'R21': 4,  'R22': -3, 'R23': 3,  'R24': 2
 }
 
+@functools.lru_cache(maxsize=64)
 def get_glonass_frequencies(sat_id: str) -> tuple:
     """
     Get GLONASS frequencies for a specific satellite.
@@ -72,19 +76,24 @@ def get_glonass_frequencies(sat_id: str) -> tuple:
     
     return F1, F2, L1, L2, alpha
 
-def get_frequencies(sat_system: str, sat_id: str = None) -> dict:
+@functools.lru_cache(maxsize=64)
+def get_frequencies(sat_system: str, sat_id: str = None) -> types.MappingProxyType:
     """
     Get carrier frequencies and wavelengths for a satellite system.
-    
+
+    Called once per satellite per epoch in typical pipelines, so results
+    are memoized. The returned mapping is read-only so cached entries
+    cannot be mutated by callers.
+
     Args:
         sat_system: 'G' (GPS), 'R' (GLONASS), 'E' (Galileo), 'C' (BeiDou)
         sat_id: Full satellite ID (required for GLONASS, e.g., 'R01')
-    
+
     Returns:
-        dict with keys: 'F1', 'F2', 'L1', 'L2', 'alpha'
+        Read-only mapping with keys: 'F1', 'F2', 'L1', 'L2', 'alpha'
     """
     if sat_system == 'G':  # GPS
-        return {
+        freqs = {
             'F1': GPS_F1, 'F2': GPS_F2,
             'L1': GPS_L1, 'L2': GPS_L2,
             'alpha': ALPHA_GPS
@@ -93,32 +102,35 @@ def get_frequencies(sat_system: str, sat_id: str = None) -> dict:
         if sat_id is None:
             raise ValueError("GLONASS requires satellite ID")
         F1, F2, L1, L2, alpha = get_glonass_frequencies(sat_id)
-        return {
+        freqs = {
             'F1': F1, 'F2': F2,
             'L1': L1, 'L2': L2,
             'alpha': alpha
         }
     elif sat_system == 'E':  # Galileo
-        return {
+        freqs = {
             'F1': GALILEO_F1, 'F2': GALILEO_F2,
             'L1': GALILEO_L1, 'L2': GALILEO_L2,
             'alpha': ALPHA_GALILEO
         }
     elif sat_system == 'C':  # BeiDou
-        return {
+        freqs = {
             'F1': BEIDOU_F1, 'F2': BEIDOU_F2,
             'L1': BEIDOU_L1, 'L2': BEIDOU_L2,
             'alpha': ALPHA_BEIDOU
         }
     else:
         # Default to GPS
-        return {
+        freqs = {
             'F1': GPS_F1, 'F2': GPS_F2,
             'L1': GPS_L1, 'L2': GPS_L2,
             'alpha': ALPHA_GPS
         }
+    return types.MappingProxyType(freqs)
 
-# Confirmation print
-print(f"✓ Constants loaded:")
-print(f"  GPS: F1={F1_GPS:.2f} MHz, F2={F2_GPS:.2f} MHz, λ1={GPS_L1:.4f} m, λ2={GPS_L2:.4f} m")
-print(f"  Alpha (GPS): {ALPHA_GPS:.4f}")
\ No newline at end of file
+if __name__ == "__main__":
+    # Confirmation print (only when run directly; importing this module must
+    # stay side-effect free, e.g. under multiprocessing workers)
+    print(f"✓ Constants loaded:")
+    print(f"  GPS: F1={F1_GPS:.2f} MHz, F2={F2_GPS:.2f} MHz, λ1={GPS_L1:.4f} m, λ2={GPS_L2:.4f} m")
+    print(f"  Alpha (GPS): {ALPHA_GPS:.4f}")
\ No newline at end of file
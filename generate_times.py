@@ -8,12 +8,12 @@ Useful for creating time steps at which satellite positions are computed, especi
 Author: F.Ahmadzade
 """
 
-from typing import List
+import numpy as np
 import pandas as pd
 
-def generate_times(start_time: pd.Timestamp, end_time: pd.Timestamp, interval_sec: int = 30) -> List[pd.Timestamp]:
+def generate_times(start_time: pd.Timestamp, end_time: pd.Timestamp, interval_sec: int = 30) -> np.ndarray:
     """
-    Generate a list of timestamps starting from start_time to end_time with fixed interval steps.
+    Generate timestamps starting from start_time to end_time with fixed interval steps.
 
     Args:
         start_time (pd.Timestamp): The start time of the interval.
@@ -21,18 +21,19 @@ def generate_times(start_time: pd.Timestamp, end_time: pd.Timestamp, interval_se
         interval_sec (int): Time step interval in seconds (default 30).
 
     Returns:
-        List[pd.Timestamp]: List of timestamps separated by interval_sec.
+        np.ndarray: datetime64[ns] array of timestamps separated by
+            interval_sec (end inclusive), built with a single vectorized
+            arange instead of allocating per-step Timestamp objects.
     """
     if start_time > end_time:
         raise ValueError("start_time must be less than or equal to end_time")
-    
-    times = []
-    current = start_time
-    while current <= end_time:
-        times.append(current)
-        current += pd.Timedelta(seconds=interval_sec)
-    
-    return times
+
+    start_ns = np.datetime64(start_time, 'ns')
+    end_ns = np.datetime64(end_time, 'ns')
+    step = np.timedelta64(int(interval_sec * 1_000_000_000), 'ns')
+
+    n_steps = int((end_ns - start_ns) // step) + 1
+    return start_ns + step * np.arange(n_steps)
 
 if __name__ == "__main__":
     # Example usage:
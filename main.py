@@ -16,8 +16,8 @@ from read_rinex import read_rinex, get_observation_summary
 from read_navigation import read_navigation_file, get_ephemeris_batch
 from get_time_range import get_time_range
 from generate_times import generate_times
-from interpolate_orbital_params import interpolate_orbital_params
-from compute_satellite_position import compute_satellite_position
+from compute_satellite_position import (compute_satellite_position,
+                                        EPHEMERIS_KEY_MAP, REQUIRED_PARAMS)
 from save_to_csv import save_to_csv
 from plot_3d_path import plot_3d_path
 from read_navigation import to_float
@@ -43,7 +43,8 @@ def main():
     sat_dict = read_rinex(obs_file, systems='G', min_epochs=3, verbose=True)
 
     print("Summary of loaded satellites (observations):")
-    print(get_observation_summary(sat_dict).to_string(index=False))
+    print(get_observation_summary(sat_dict).to_string(index=False,
+                                                      float_format='%.2f'))
 
     if prn not in sat_dict:
         print(f"Satellite {prn} not found in observations.")
@@ -57,35 +58,33 @@ def main():
     times = generate_times(start_time, end_time, interval_sec=30)
 
     print("Extracting ephemeris for satellite batch...")
-    eph_dict = get_ephemeris_batch(nav_data, [prn], times[0])
+    eph_dict = get_ephemeris_batch(nav_data, [prn], pd.Timestamp(times[0]))
 
     if prn not in eph_dict:
         print(f"No valid ephemeris found for satellite {prn} at starting time.")
         return
 
-    # Convert ephemeris values explicitly to float or np.nan to avoid None type
+    # Convert ephemeris values explicitly to float or np.nan to avoid None type,
+    # normalizing parameter names to the spelling compute_satellite_position expects
     cleaned_ephemeris = {}
     for k, v in eph_dict[prn].items():
+        key = EPHEMERIS_KEY_MAP.get(k, k)
         try:
-            val = float(v)
-            if val is None:
-                val = np.nan
-            cleaned_ephemeris[k] = val
+            cleaned_ephemeris[key] = float(v)
         except (TypeError, ValueError):
-            cleaned_ephemeris[k] = np.nan
+            cleaned_ephemeris[key] = np.nan
 
-    nav_df = pd.DataFrame({k: [v] * len(times) for k, v in cleaned_ephemeris.items()})
-    nav_df['time'] = pd.Series(times).values
-    nav_df = nav_df.set_index('time')
-
-    nav_df = nav_df.astype(float)  # Ensure numeric type for interpolation
-
-    print("Interpolating orbital parameters over sample times...")
-    orbital_params = interpolate_orbital_params(nav_df, times)
+    # A single ephemeris record is constant over the sampling window, so
+    # broadcast the scalars directly instead of tiling a DataFrame and
+    # running a no-op interpolation pass.
+    print("Broadcasting orbital parameters over sample times...")
+    n_times = len(times)
+    orbital_params = {k: np.full(n_times, v if np.isfinite(v) else 0.0)
+                      for k, v in cleaned_ephemeris.items()
+                      if k in REQUIRED_PARAMS}
 
     # Add 'tk' : time difference array in seconds from reference
-    base_time = nav_df.index[0]
-    tk_seconds = np.array([(t - base_time).total_seconds() for t in nav_df.index])
+    tk_seconds = (times - times[0]).astype(np.int64) * 1e-9
     orbital_params['tk'] = tk_seconds
 
     print("Computing satellite ECEF positions...")
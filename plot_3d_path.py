@@ -7,43 +7,70 @@ Visualizes satellite trajectory as a 3D plot using computed ECEF coordinates.
 Author: F.Ahmadzade
 """
 
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 unused import; necessary for 3D projection
 from typing import Dict
 
-def plot_3d_path(position_data: Dict[str, any], title: str = "Satellite 3D Path") -> None:
+# Marker rendering dominates 3D draw time on long paths; above this many
+# points the trajectory is drawn as a plain line.
+MAX_MARKER_POINTS = 500
+
+
+def _draw_path(ax, position_data: Dict[str, any], title: str) -> None:
+    X = position_data.get('X')
+    Y = position_data.get('Y')
+    Z = position_data.get('Z')
+
+    marker = 'o' if X is not None and len(X) <= MAX_MARKER_POINTS else None
+    ax.plot(X, Y, Z, marker=marker, linestyle='-', color='b', label='Satellite Path')
+    ax.set_xlabel('X (meters)')
+    ax.set_ylabel('Y (meters)')
+    ax.set_zlabel('Z (meters)')
+    ax.set_title(title)
+    ax.legend()
+
+
+def plot_3d_path(position_data: Dict[str, any],
+                 title: str = "Satellite 3D Path",
+                 savepath: str = None) -> None:
     """
     Plot the 3D satellite trajectory.
 
     Args:
         position_data (Dict[str, any]): Dictionary with keys 'X', 'Y', 'Z' containing position arrays or lists.
         title (str): Title of the plot.
+        savepath (str, optional): When given, render headlessly with the Agg
+            backend and write the figure to this path instead of showing an
+            interactive window.
 
     Returns:
         None
     """
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
+    # matplotlib is imported lazily so batch runs that never plot don't pay
+    # its import cost.
+    if savepath is not None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: F401
+        from matplotlib.figure import Figure
 
-    X = position_data.get('X')
-    Y = position_data.get('Y')
-    Z = position_data.get('Z')
+        fig = Figure()
+        ax = fig.add_subplot(111, projection='3d')
+        _draw_path(ax, position_data, title)
+        fig.savefig(savepath)
+        return
 
-    ax.plot(X, Y, Z, marker='o', linestyle='-', color='b', label='Satellite Path')
-    ax.set_xlabel('X (meters)')
-    ax.set_ylabel('Y (meters)')
-    ax.set_zlabel('Z (meters)')
-    ax.set_title(title)
-    ax.legend()
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 unused import; necessary for 3D projection
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    _draw_path(ax, position_data, title)
     plt.show()
 
 if __name__ == "__main__":
     # Example usage
     import numpy as np
-    
+
     pos_data = {
         'X': np.linspace(0, 10000, 100),
         'Y': np.sin(np.linspace(0, 10, 100)) * 10000,
         'Z': np.cos(np.linspace(0, 10, 100)) * 10000
     }
-    plot_3d_path(pos_data, "Example Satellite Orbit Path")
\ No newline at end of file
+    plot_3d_path(pos_data, "Example Satellite Orbit Path")
@@ -7,13 +7,26 @@ Supports RINEX 2.x, 3.x, 4.x formats
 Author: F.Ahmadzade
 """
 
-import georinex as gr
 import pandas as pd
+from rinex_cache import load_rinex_cached
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
+import logging
 import numpy as np
 import os
 
+logger = logging.getLogger(__name__)
+
+# Numba is optional: the JIT kernel computes the finite-value mask for a
+# whole stacked parameter matrix in one pass; without it we fall back to
+# vectorized np.isfinite. No fastmath here — it licenses the compiler to
+# assume no NaNs, which is exactly what this kernel must detect.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
 
 # Mapping of possible field names (georinex versions may differ)
 FIELD_MAPPING = {
@@ -43,6 +56,81 @@ FIELD_MAPPING = {
 }
 
 
+# GPS ephemeris parameters extracted per record, in output order
+GPS_EPHEMERIS_PARAMS = [
+    'toe', 'toc', 'M0', 'sqrtA', 'e', 'omega', 'Omega0', 'i0',
+    'DeltaN', 'OmegaDot', 'IDOT',
+    'Crs', 'Crc', 'Cus', 'Cuc', 'Cis', 'Cic',
+    'SVclockBias', 'SVclockDrift', 'SVclockDriftRate',
+    'TGD', 'IODE', 'IODC'
+]
+
+# Parameters without which a GPS ephemeris record is unusable
+GPS_CRITICAL_PARAMS = ['toe', 'M0', 'sqrtA', 'e', 'omega', 'Omega0', 'i0']
+
+# Structured row layout for the array form of a batch extraction: one row
+# per satellite, named float64 fields. Unavailable fields hold NaN (the
+# dict form uses None).
+EPH_DTYPE = np.dtype([('sat_id', 'U4')]
+                     + [(p, 'f8') for p in GPS_EPHEMERIS_PARAMS]
+                     + [('age_hours', 'f8')])
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _ages_hours_ns(eph_ns, obs_ns, out):
+        for i in prange(eph_ns.shape[0]):
+            out[i] = abs(eph_ns[i] - obs_ns) / 3.6e12  # ns -> hours
+
+    @njit(cache=True)
+    def _finite_mask(arr, out_mask):
+        flat = arr.ravel()
+        out = out_mask.ravel()
+        for i in range(flat.size):
+            out[i] = np.isfinite(flat[i])
+
+
+def ephemeris_ages_hours(eph_times, obs_time) -> np.ndarray:
+    """
+    Age in hours of each ephemeris epoch relative to an observation time.
+
+    One numeric pass over the int64 nanosecond values (numba-threaded when
+    available) — callers argmin the result to pick the nearest epoch and
+    read its age without a second subtraction.
+
+    Args:
+        eph_times: array-like of ephemeris epochs (datetime64-compatible)
+        obs_time: single observation time (Timestamp/datetime64)
+
+    Returns:
+        float64 array of absolute ages in hours.
+    """
+    eph_ns = np.asarray(eph_times, dtype='datetime64[ns]').astype(np.int64)
+    obs_ns = np.int64(np.datetime64(obs_time, 'ns').astype(np.int64))
+    out = np.empty(eph_ns.shape[0])
+    if HAVE_NUMBA:
+        _ages_hours_ns(np.ascontiguousarray(eph_ns), obs_ns, out)
+    else:
+        out[...] = np.abs(eph_ns - obs_ns) / 3.6e12
+    return out
+
+
+def sanitize_params(matrix: np.ndarray) -> np.ndarray:
+    """
+    Return a boolean validity mask (finite values) for a parameter matrix.
+
+    Replaces the old per-scalar to_float NaN/Inf checking on the batch
+    path: one pass over the stacked float64 array instead of a Python
+    call with isinstance chains per field per satellite.
+    """
+    mask = np.empty(matrix.shape, dtype=np.bool_)
+    if HAVE_NUMBA:
+        _finite_mask(np.ascontiguousarray(matrix), mask)
+    else:
+        np.isfinite(matrix, out=mask)
+    return mask
+
+
 def to_float(val) -> Optional[float]:
     """
     Convert xarray value to float, handling different data types.
@@ -53,30 +141,104 @@ def to_float(val) -> Optional[float]:
     Returns:
         Float value or None if conversion fails
     """
-    try:
-        # Extract the actual value
-        if hasattr(val, 'values'):
-            v = val.values
-            if hasattr(v, 'item'):
-                v = v.item()
-        else:
-            v = val
-        
-        # Convert to float
-        if isinstance(v, (str, bytes)):
-            v = float(v)
-        elif isinstance(v, (int, float, np.number)):
-            v = float(v)
-        else:
+    # Explicit type dispatch: the common cases (float, numpy scalar,
+    # 0-d array, DataArray) are handled without hasattr probes or a
+    # try/except around the whole body — exceptions are reserved for the
+    # genuinely fallible string parse.
+    v = val
+    if type(v) is float:
+        return v if np.isfinite(v) else None
+
+    values = getattr(v, 'values', None)  # DataArray and friends
+    if values is not None:
+        v = values
+    if isinstance(v, np.ndarray):
+        if v.size != 1:
             return None
-        
-        # Check for NaN or inf
-        if np.isnan(v) or np.isinf(v):
+        v = v.flat[0]
+
+    if isinstance(v, (np.number, int, float)):
+        v = float(v)
+        return v if np.isfinite(v) else None
+
+    if isinstance(v, (str, bytes)):
+        try:
+            v = float(v)
+        except ValueError:
             return None
-            
-        return v
-    except (ValueError, TypeError, AttributeError):
-        return None
+        return v if np.isfinite(v) else None
+
+    return None
+
+
+class NavIndex:
+    """
+    Binary-search index over a navigation dataset's time axis.
+
+    Materializes the (sorted) epoch axis as int64 nanoseconds once;
+    nearest-epoch queries are then a plain np.searchsorted with a ±1
+    correction — a C binary search per query, with a vectorized variant
+    for many observation times at once.
+    """
+
+    def __init__(self, nav_data):
+        self.times = np.asarray(nav_data.time.values, dtype='datetime64[ns]')
+        self.t_ns = self.times.astype(np.int64)
+        self.sv_to_pos = {str(s): i for i, s in enumerate(nav_data.sv.values)}
+
+    def nearest(self, ts) -> int:
+        """Position of the epoch closest to a single timestamp."""
+        ts_ns = int(np.datetime64(ts, 'ns').astype(np.int64))
+        t = self.t_ns
+        i = int(np.searchsorted(t, ts_ns))
+        if i == 0:
+            return 0
+        if i == len(t):
+            return len(t) - 1
+        return i if (ts_ns - t[i - 1]) > (t[i] - ts_ns) else i - 1
+
+    def nearest_many(self, timestamps) -> np.ndarray:
+        """Positions of the epochs closest to each of many timestamps."""
+        ts = np.asarray(timestamps, dtype='datetime64[ns]').astype(np.int64)
+        i = np.clip(np.searchsorted(self.t_ns, ts), 1, len(self.t_ns) - 1)
+        left, right = self.t_ns[i - 1], self.t_ns[i]
+        return np.where((ts - left) > (right - ts), i, i - 1)
+
+
+def _nav_index(nav_data) -> NavIndex:
+    # Built once per Dataset (cached in attrs, same pattern as the field
+    # resolver) so repeated ephemeris queries reuse one index.
+    idx = nav_data.attrs.get('_nav_index')
+    if idx is None:
+        idx = NavIndex(nav_data)
+        nav_data.attrs['_nav_index'] = idx
+    return idx
+
+
+def build_field_resolver(nav_data) -> Dict[str, Optional[str]]:
+    """
+    Map canonical field names to the dataset's actual variable names.
+
+    georinex versions spell some fields differently, so each canonical name
+    has a list of candidates in FIELD_MAPPING. Walking those lists per field
+    per satellite is wasted work — the resolution only depends on the
+    dataset's schema. This resolves every canonical name once and caches the
+    result in the dataset's attrs; fields absent from the dataset map to
+    None.
+
+    Args:
+        nav_data: xarray Dataset from read_navigation_file
+
+    Returns:
+        Dict[canonical_name, actual_name or None]
+    """
+    resolver = nav_data.attrs.get('_field_resolver')
+    if resolver is None:
+        data_vars = set(nav_data.data_vars)
+        resolver = {canon: next((n for n in names if n in data_vars), None)
+                    for canon, names in FIELD_MAPPING.items()}
+        nav_data.attrs['_field_resolver'] = resolver
+    return resolver
 
 
 def get_field_value(eph_data, field_name: str) -> Optional[float]:
@@ -122,34 +284,22 @@ def read_navigation_file(nav_file_path: str,
     if not os.path.exists(nav_file_path):
         raise FileNotFoundError(f"Navigation file not found: {nav_file_path}")
     
-    print(f"{'='*70}")
-    print(f"Loading RINEX Navigation File")
-    print(f"{'='*70}")
-    print(f"File: {os.path.basename(nav_file_path)}")
+    logger.info("Loading RINEX navigation file: %s", os.path.basename(nav_file_path))
     
     try:
-        # Load navigation file using georinex
-        if systems:
-            nav = gr.load(nav_file_path, use=systems)
-        else:
-            nav = gr.load(nav_file_path)
+        # Load navigation file using georinex (LRU + pickle-sidecar cached)
+        nav = load_rinex_cached(nav_file_path, systems)
         
         satellites = nav.sv.values if hasattr(nav, 'sv') else []
         time_range = nav.time.values if hasattr(nav, 'time') else []
         
-        print(f"✓ Navigation data loaded")
-        print(f"  Satellites: {len(satellites)}")
-        print(f"  Systems: {set([s[0] for s in satellites])}")
-        
+        logger.info("Navigation data loaded: %d satellites, systems %s",
+                    len(satellites), sorted({s[0] for s in satellites}))
         if len(time_range) > 0:
-            print(f"  Time range: {pd.Timestamp(time_range[0])} to {pd.Timestamp(time_range[-1])}")
-        
-        # Print available fields (useful for debugging)
-        fields = list(nav.data_vars)
-        print(f"  Available fields: {len(fields)}")
-        
-        print(f"{'='*70}\n")
-        
+            logger.debug("Time range: %s to %s",
+                         pd.Timestamp(time_range[0]), pd.Timestamp(time_range[-1]))
+        logger.debug("Available fields: %d", len(nav.data_vars))
+
         return nav
         
     except Exception as e:
@@ -183,13 +333,14 @@ def get_ephemeris(nav_data,
         
         # Select satellite
         sat_nav = nav_data.sel(sv=sat_id)
-        
-        # Find closest ephemeris in time
-        eph_data = sat_nav.sel(time=obs_time, method='nearest')
-        
+
+        # Find closest ephemeris in time via the cached binary-search index
+        nav_idx = _nav_index(nav_data)
+        pos = nav_idx.nearest(obs_time)
+        eph_data = sat_nav.isel(time=pos)
+
         # Get ephemeris time
-        eph_time_raw = eph_data['time'].values
-        eph_time = pd.Timestamp(eph_time_raw)
+        eph_time = pd.Timestamp(nav_idx.times[pos])
         
         # Check ephemeris age
         age_seconds = abs((obs_time - eph_time).total_seconds())
@@ -213,22 +364,15 @@ def get_ephemeris(nav_data,
         }
         
         if sat_system == 'G':
-            # GPS ephemeris parameters
-            params = [
-                'toe', 'toc', 'M0', 'sqrtA', 'e', 'omega', 'Omega0', 'i0',
-                'DeltaN', 'OmegaDot', 'IDOT',
-                'Crs', 'Crc', 'Cus', 'Cuc', 'Cis', 'Cic',
-                'SVclockBias', 'SVclockDrift', 'SVclockDriftRate',
-                'TGD', 'IODE', 'IODC'
-            ]
-            
-            for param in params:
-                value = get_field_value(eph_data, param)
-                ephemeris[param] = value
-            
+            # GPS ephemeris parameters, via the per-dataset field resolver
+            # (one schema walk per file instead of a name scan per field)
+            resolver = build_field_resolver(nav_data)
+            for param in GPS_EPHEMERIS_PARAMS:
+                name = resolver.get(param)
+                ephemeris[param] = to_float(eph_data[name]) if name else None
+
             # Check if critical parameters are available
-            critical = ['toe', 'M0', 'sqrtA', 'e', 'omega', 'Omega0', 'i0']
-            missing = [p for p in critical if ephemeris.get(p) is None]
+            missing = [p for p in GPS_CRITICAL_PARAMS if ephemeris.get(p) is None]
             
             if missing:
                 if verbose:
@@ -266,29 +410,124 @@ def get_ephemeris(nav_data,
 def get_ephemeris_batch(nav_data,
                         sat_list: List[str],
                         obs_time: pd.Timestamp,
-                        max_age_hours: float = 4.0) -> Dict[str, Dict]:
+                        max_age_hours: float = 4.0,
+                        as_array: bool = False):
     """
     Get ephemeris for multiple satellites at once.
-    
+
     Args:
         nav_data: Navigation data from georinex
         sat_list: List of satellite IDs
         obs_time: Observation time
         max_age_hours: Maximum ephemeris age
-    
+        as_array: Return a structured NumPy array (EPH_DTYPE, one row per
+            satellite, missing fields NaN) instead of the dict-of-dicts.
+            The array form keeps each parameter contiguous across
+            satellites, so batch consumers can slice columns without
+            rebuilding per-satellite dicts; use ephemeris_record_as_dict
+            to convert a row back for the legacy interface.
+
     Returns:
-        Dict[sat_id → ephemeris_dict]
+        Dict[sat_id → ephemeris_dict], or an EPH_DTYPE array if as_array.
     """
+    # One vectorized selection for the whole batch: the nearest epoch is
+    # shared by every satellite (the time coordinate is the file-wide
+    # union), so each parameter is pulled as a single length-N array and
+    # the per-satellite dicts are assembled from plain NumPy values
+    # instead of running N xarray label selections.
+    available = set(str(s) for s in nav_data.sv.values)
+    present = [s for s in sat_list if s in available]
+    if not present:
+        return {}
+
+    nav_idx = _nav_index(nav_data)
+    pos = nav_idx.nearest(obs_time)
+    sub = nav_data.sel(sv=present).isel(time=pos)
+    eph_time = pd.Timestamp(nav_idx.times[pos])
+    age_hours = abs((obs_time - eph_time).total_seconds()) / 3600.0
+
+    # Field-name variants come pre-resolved from the per-dataset resolver.
+    # Stack everything into one (n_params, n_sat) float64 matrix and compute
+    # the validity mask in a single pass (unresolved fields stay NaN rows).
+    resolver = build_field_resolver(nav_data)
+    matrix = np.full((len(GPS_EPHEMERIS_PARAMS), len(present)), np.nan)
+    for row, param in enumerate(GPS_EPHEMERIS_PARAMS):
+        name = resolver.get(param)
+        if name is not None:
+            matrix[row] = np.atleast_1d(
+                np.asarray(sub[name].values, dtype=np.float64))
+    valid = sanitize_params(matrix)
+
+    critical_rows = [GPS_EPHEMERIS_PARAMS.index(p) for p in GPS_CRITICAL_PARAMS]
+    if as_array:
+        keep = [idx for idx, sat_id in enumerate(present)
+                if sat_id[0] == 'G' and valid[critical_rows, idx].all()]
+        eph_arr = np.empty(len(keep), dtype=EPH_DTYPE)
+        eph_arr['sat_id'] = [present[idx] for idx in keep]
+        eph_arr['age_hours'] = age_hours
+        for row, param in enumerate(GPS_EPHEMERIS_PARAMS):
+            col = matrix[row, keep]
+            col[~valid[row, keep]] = np.nan
+            eph_arr[param] = col
+        # Same toc←toe fallback as the dict path, vectorized over rows.
+        toc_nan = np.isnan(eph_arr['toc'])
+        eph_arr['toc'][toc_nan] = eph_arr['toe'][toc_nan]
+        return eph_arr
+
     eph_dict = {}
-    
-    for sat_id in sat_list:
-        eph = get_ephemeris(nav_data, sat_id, obs_time, max_age_hours, verbose=False)
-        if eph is not None:
-            eph_dict[sat_id] = eph
-    
+    for idx, sat_id in enumerate(present):
+        if sat_id[0] != 'G':
+            continue  # only GPS records are implemented (see get_ephemeris)
+
+        ephemeris = {
+            'sat_id': sat_id,
+            'system': sat_id[0],
+            'eph_time': eph_time,
+            'obs_time': obs_time,
+            'age_hours': age_hours,
+        }
+        for row, param in enumerate(GPS_EPHEMERIS_PARAMS):
+            ephemeris[param] = float(matrix[row, idx]) if valid[row, idx] else None
+
+        if any(ephemeris[p] is None for p in GPS_CRITICAL_PARAMS):
+            continue
+        if ephemeris['toc'] is None:
+            ephemeris['toc'] = ephemeris['toe']
+        eph_dict[sat_id] = ephemeris
+
     return eph_dict
 
 
+def ephemeris_record_as_dict(eph_arr: np.ndarray, i: int,
+                             eph_time: pd.Timestamp = None,
+                             obs_time: pd.Timestamp = None) -> Dict:
+    """
+    Convert one row of an EPH_DTYPE array back to the legacy dict form.
+
+    Args:
+        eph_arr: Structured array from get_ephemeris_batch(as_array=True)
+        i: Row index into eph_arr
+        eph_time: Ephemeris reference timestamp to attach, if known
+        obs_time: Observation timestamp to attach, if known
+
+    Returns:
+        Dict in the same shape get_ephemeris produces (NaN fields → None).
+    """
+    rec = eph_arr[i]
+    sat_id = str(rec['sat_id'])
+    ephemeris = {
+        'sat_id': sat_id,
+        'system': sat_id[0],
+        'eph_time': eph_time,
+        'obs_time': obs_time,
+        'age_hours': float(rec['age_hours']),
+    }
+    for param in GPS_EPHEMERIS_PARAMS:
+        value = float(rec[param])
+        ephemeris[param] = value if np.isfinite(value) else None
+    return ephemeris
+
+
 def print_ephemeris_summary(eph_dict: Dict[str, Dict]):
     """
     Print summary of loaded ephemeris.
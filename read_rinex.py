@@ -6,7 +6,10 @@ Handles missing data, multiple observation types, all GNSS systems
 
 Author: F.Ahmadzade
 """
+import functools
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List, Tuple
 import pandas as pd
 import numpy as np
@@ -14,55 +17,48 @@ try:
     import georinex as gr
 except ImportError:
     raise ImportError("Please install georinex: pip install georinex")
+from rinex_cache import load_rinex_cached
 
+# Per-satellite progress goes through a module logger: print acquires the
+# stdout lock and flushes per call, which adds up over pipelines of many
+# files, while disabled log levels cost one short-circuited check.
+logger = logging.getLogger(__name__)
 
-# Comprehensive mapping: RINEX 3/4 → RINEX 2 standard
-RINEX3_MAPPING = {
-    # GPS L1 Phase
-    'L1C': 'L1', 'L1S': 'L1', 'L1L': 'L1', 'L1X': 'L1',
-    'L1P': 'L1', 'L1W': 'L1', 'L1Y': 'L1', 'L1M': 'L1',
-    
-    # GPS L2 Phase
-    'L2C': 'L2', 'L2S': 'L2', 'L2L': 'L2', 'L2X': 'L2',
-    'L2P': 'L2', 'L2W': 'L2', 'L2Y': 'L2', 'L2M': 'L2',
-    
-    # GPS L5 Phase
-    'L5I': 'L5', 'L5Q': 'L5', 'L5X': 'L5',
-    
-    # GPS L1 Code
-    'C1C': 'C1', 'C1S': 'C1', 'C1L': 'C1', 'C1X': 'C1',
-    'C1P': 'C1', 'C1W': 'C1', 'C1Y': 'C1', 'C1M': 'C1',
-    
-    # GPS L2 Code
-    'C2C': 'C2', 'C2S': 'C2', 'C2L': 'C2', 'C2X': 'C2',
-    'C2P': 'C2', 'C2W': 'C2', 'C2Y': 'C2', 'C2M': 'C2',
-    
-    # GPS L5 Code
-    'C5I': 'C5', 'C5Q': 'C5', 'C5X': 'C5',
-    
-    # GLONASS
-    'L1C': 'L1', 'L1P': 'L1', 'L2C': 'L2', 'L2P': 'L2',
-    'C1C': 'C1', 'C1P': 'C1', 'C2C': 'C2', 'C2P': 'C2',
-    
-    # Galileo
-    'L1A': 'L1', 'L1B': 'L1', 'L1C': 'L1', 'L1X': 'L1', 'L1Z': 'L1',
-    'L5I': 'L5', 'L5Q': 'L5', 'L5X': 'L5',
-    'L7I': 'L7', 'L7Q': 'L7', 'L7X': 'L7',
-    'L8I': 'L8', 'L8Q': 'L8', 'L8X': 'L8',
-    'C1A': 'C1', 'C1B': 'C1', 'C1C': 'C1', 'C1X': 'C1', 'C1Z': 'C1',
-    'C5I': 'C5', 'C5Q': 'C5', 'C5X': 'C5',
-    'C7I': 'C7', 'C7Q': 'C7', 'C7X': 'C7',
-    'C8I': 'C8', 'C8Q': 'C8', 'C8X': 'C8',
-    
-    # BeiDou
-    'L2I': 'L2', 'L2Q': 'L2', 'L2X': 'L2',
-    'L6I': 'L6', 'L6Q': 'L6', 'L6X': 'L6',
-    'L7I': 'L7', 'L7Q': 'L7', 'L7X': 'L7',
-    'C2I': 'C2', 'C2Q': 'C2', 'C2X': 'C2',
-    'C6I': 'C6', 'C6Q': 'C6', 'C6X': 'C6',
-    'C7I': 'C7', 'C7Q': 'C7', 'C7X': 'C7',
+
+# Comprehensive mapping: RINEX 3/4 → RINEX 2 standard, keyed per system.
+# The old flat dict repeated codes like 'L1C' across the GPS/GLONASS/Galileo
+# sections, so later literals silently overwrote earlier ones; keying by
+# system makes each entry unambiguous and lets the rename pass consult only
+# the codes that can occur for the satellite at hand.
+def _expand_codes(bands: Dict[str, str]) -> Dict[str, str]:
+    # A RINEX 3 observation code is <type><band><tracking attribute>; its
+    # RINEX 2 standard name is <type><band>. Generating the table from a
+    # {band: attributes} spec keeps every phase (L) and pseudorange (C)
+    # variant in lockstep instead of hand-maintaining ~100 literals.
+    return {f"{t}{b}{a}": f"{t}{b}"
+            for t in 'LC'
+            for b, attrs in bands.items()
+            for a in attrs}
+
+
+RINEX3_MAPPING_BY_SYSTEM = {
+    'G': _expand_codes({'1': 'CSLXPWYM', '2': 'CSLXPWYM', '5': 'IQX'}),
+    'R': _expand_codes({'1': 'CP', '2': 'CP'}),
+    'E': _expand_codes({'1': 'ABCXZ', '5': 'IQX', '7': 'IQX', '8': 'IQX'}),
+    'C': _expand_codes({'2': 'IQX', '6': 'IQX', '7': 'IQX'}),
 }
 
+# Precomputed per-system code sets for the set-intersection rename pass
+_CODES_BY_SYSTEM = {sys: frozenset(mapping)
+                    for sys, mapping in RINEX3_MAPPING_BY_SYSTEM.items()}
+
+# System-agnostic fallback for callers that don't know the constellation
+# (codes agree on their standard name wherever they overlap)
+RINEX3_MAPPING = {code: std
+                 for mapping in RINEX3_MAPPING_BY_SYSTEM.values()
+                 for code, std in mapping.items()}
+_ALL_CODES = frozenset(RINEX3_MAPPING)
+
 # Fallback: If P2 exists but not C2, map P2→C2
 RINEX2_FALLBACK = {
     'P1': 'C1',
@@ -70,77 +66,118 @@ RINEX2_FALLBACK = {
 }
 
 
+@functools.lru_cache(maxsize=32)
+def _read_version_field(obs_file: str, mtime_ns: int) -> str:
+    try:
+        fd = os.open(obs_file, os.O_RDONLY)
+        try:
+            # RINEX version is in columns 1-9; one bounded 9-byte read
+            # beats text-mode readline, which buffers and scans for a
+            # newline of unbounded distance
+            buf = os.read(fd, 9)
+        finally:
+            os.close(fd)
+        return buf.decode('ascii', 'replace').strip()
+    except OSError:
+        return 'Unknown'
+
+
 def detect_rinex_version(obs_file: str) -> str:
     """
     Detect RINEX version from file header.
-    
+
     Returns:
         Version string (e.g., '2.11', '3.04', '4.00')
     """
     try:
-        with open(obs_file, 'r') as f:
-            first_line = f.readline()
-            # RINEX version is in columns 1-9
-            version = first_line[0:9].strip()
-            return version
-    except:
+        return _read_version_field(obs_file, os.stat(obs_file).st_mtime_ns)
+    except OSError:
         return 'Unknown'
 
 
-def standardize_columns(df: pd.DataFrame, verbose: bool = False) -> pd.DataFrame:
+def standardize_columns(df: pd.DataFrame, system: Optional[str] = None,
+                        verbose: bool = False) -> pd.DataFrame:
     """
     Convert RINEX 3/4 column names to RINEX 2 standard names.
     Handles priority: prefer modern codes over legacy ones.
-    
+
     Args:
         df: DataFrame with RINEX observations
+        system: Constellation letter ('G', 'R', 'E', 'C') to restrict the
+                rename table to codes valid for that system; None uses the
+                system-agnostic union.
         verbose: Print standardization details
-    
+
     Returns:
-        DataFrame with standardized column names
+        The same DataFrame with standardized column names. Renaming
+        assigns the columns Index directly on the passed frame — no data
+        copy or block-manager rebuild the way df.rename does.
     """
-    rename_dict = {}
-    
-    # First pass: RINEX 3/4 codes
-    for col in df.columns:
-        if col in RINEX3_MAPPING:
-            standard_name = RINEX3_MAPPING[col]
-            if standard_name not in df.columns:
-                rename_dict[col] = standard_name
-    
-    # Second pass: RINEX 2 fallback (P1, P2)
-    if 'C1' not in df.columns and 'C2' not in df.columns:
-        for col in df.columns:
-            if col in RINEX2_FALLBACK:
-                standard_name = RINEX2_FALLBACK[col]
-                if standard_name not in df.columns:
-                    rename_dict[col] = standard_name
-    
+    # The rename decision depends only on (column set, system), both drawn
+    # from a small fixed universe, and every satellite in a file shares the
+    # same column set — so the computed dict is memoized and repeat calls
+    # are a single cache hit.
+    rename_dict = _rename_for_columns(frozenset(df.columns), system)
+
     if rename_dict:
-        df = df.rename(columns=rename_dict)
+        df.columns = [rename_dict.get(c, c) for c in df.columns]
         if verbose:
             print(f"   Standardized: {rename_dict}")
-    
+
     return df
 
 
+@functools.lru_cache(maxsize=64)
+def _rename_for_columns(cols: frozenset, system: Optional[str]) -> Dict[str, str]:
+    mapping = RINEX3_MAPPING_BY_SYSTEM.get(system, RINEX3_MAPPING)
+    codes = _CODES_BY_SYSTEM.get(system, _ALL_CODES)
+
+    # Set intersection picks the renamable columns in one C-level pass
+    # instead of a dict probe per column; each standard name is claimed at
+    # most once so two variants never collapse into duplicate columns.
+    rename_dict = {}
+    for col in sorted(codes & cols):
+        standard_name = mapping[col]
+        if standard_name not in cols and standard_name not in rename_dict.values():
+            rename_dict[col] = standard_name
+
+    # Second pass: RINEX 2 fallback (P1, P2)
+    if 'C1' not in cols and 'C2' not in cols:
+        for col in sorted(set(RINEX2_FALLBACK) & cols):
+            standard_name = RINEX2_FALLBACK[col]
+            if standard_name not in cols and standard_name not in rename_dict.values():
+                rename_dict[col] = standard_name
+
+    return rename_dict
+
+
 def add_time_gaps(df: pd.DataFrame, threshold_sec: float = 30.0) -> pd.DataFrame:
     """
     Add columns indicating time gaps and sampling interval.
+
+    Writes the two columns onto the caller's frame (read_rinex hands in a
+    freshly built per-satellite frame) instead of copying every
+    observation column just to append them.
     """
-    df = df.copy()
-    df['time_diff'] = df['time'].diff().dt.total_seconds()
-    df['has_gap'] = df['time_diff'] > threshold_sec
-    df.loc[0, 'has_gap'] = False  # First epoch has no gap
-    
-    # Estimate nominal sampling interval (most common time_diff)
+    t = df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    diff = np.empty(len(df))
+    if len(df):
+        diff[0] = np.nan  # First epoch has no gap (NaN > threshold is False)
+        # Divide rather than multiply by 1e-9: 1e9 is exact in binary, so
+        # whole-second intervals stay exact (30.0, not 30.000000000000004)
+        diff[1:] = np.diff(t) / 1e9
+    df['time_diff'] = diff
+    df['has_gap'] = diff > threshold_sec
+    
+    # Estimate nominal sampling interval (most common time_diff). GNSS
+    # sampling intervals are whole seconds, so a rounded bincount finds the
+    # mode in one counting pass instead of Series.mode's sort-and-group.
     if len(df) > 1:
-        time_diffs = df['time_diff'].dropna()
-        if len(time_diffs) > 0:
-            # Mode of time differences
-            nominal_interval = time_diffs.mode().iloc[0] if len(time_diffs.mode()) > 0 else 30.0
-            df.attrs['sampling_interval'] = nominal_interval
-    
+        td = df['time_diff'].dropna().round().astype(np.int64).to_numpy()
+        td = td[td >= 0]
+        if td.size:
+            df.attrs['sampling_interval'] = float(np.bincount(td).argmax())
+
     return df
 
 
@@ -153,42 +190,101 @@ def validate_observation_pair(df: pd.DataFrame, sat_id: str) -> Tuple[bool, str]
     """
     required_phase = ['L1', 'L2']
     required_code = ['C1', 'C2']
-    
-    has_phase = all(col in df.columns for col in required_phase)
-    has_code = all(col in df.columns for col in required_code)
-    
+
+    # One hashed set of the columns; each requirement is then an O(1)
+    # subset test instead of per-column Index membership probes
+    cols = frozenset(df.columns)
+    has_phase = cols >= frozenset(required_phase)
+    has_code = cols >= frozenset(required_code)
+
     if has_phase and has_code:
-        # Check data completeness (at least 50% valid)
-        l1_valid = df['L1'].notna().sum() / len(df)
-        l2_valid = df['L2'].notna().sum() / len(df)
-        c1_valid = df['C1'].notna().sum() / len(df)
-        c2_valid = df['C2'].notna().sum() / len(df)
-        
+        # Check data completeness (at least 50% valid): one notna matrix
+        # and one reduction produce all four fractions instead of four
+        # separate column scans
+        frac = df[required_phase + required_code].notna().to_numpy().mean(axis=0)
+        l1_valid, l2_valid = frac[0], frac[1]
+
         if l1_valid < 0.5 or l2_valid < 0.5:
             return False, f"Low phase completeness (L1:{l1_valid:.1%}, L2:{l2_valid:.1%})"
-        
+
         return True, "Valid"
     else:
         missing = []
         if not has_phase:
-            missing_phase = [p for p in required_phase if p not in df.columns]
+            missing_phase = [p for p in required_phase if p not in cols]
             missing.append(f"Phase: {missing_phase}")
         if not has_code:
-            missing_code = [c for c in required_code if c not in df.columns]
+            missing_code = [c for c in required_code if c not in cols]
             missing.append(f"Code: {missing_code}")
         
         return False, f"Missing observations - {', '.join(missing)}"
 
 
-def read_rinex(obs_file: str, 
+def _process_satellite_frame(sat, df, min_epochs, detect_gaps, gap_threshold,
+                             float32):
+    """
+    Clean and validate one satellite's observation slice.
+
+    Returns (sat, cleaned_frame or None, skip_reason or None); used as the
+    unit of work for read_rinex's thread pool.
+    """
+    df = df.drop(columns='sv')
+
+    # Standardize columns (RINEX 3→2), restricted to this constellation
+    df = standardize_columns(df, system=str(sat)[0], verbose=False)
+
+    # Extract observation columns
+    obs_cols = [col for col in df.columns if col not in ['time', 'sv']]
+    if not obs_cols:
+        return sat, None, "No observation columns"
+
+    # Remove completely empty rows
+    df_clean = df[['time'] + obs_cols].dropna(subset=obs_cols, how='all')
+
+    if len(df_clean) < min_epochs:
+        return sat, None, f"Too few epochs ({len(df_clean)})"
+
+    # Convert time (xarray already yields datetime64[ns]; only coerce
+    # when a non-standard source slipped something else through) and
+    # order epochs. RINEX writes epoch blocks in time order, so an O(N)
+    # monotonicity scan almost always proves ordering and the stable
+    # argsort on the int64 view is reserved for the rare unsorted file.
+    if df_clean['time'].dtype != 'datetime64[ns]':
+        df_clean['time'] = pd.to_datetime(df_clean['time'])
+    t_int = df_clean['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    if len(t_int) > 1 and not np.all(t_int[1:] >= t_int[:-1]):
+        order = np.argsort(t_int, kind='stable')
+        df_clean = df_clean.iloc[order]
+    df_clean = df_clean.reset_index(drop=True)
+
+    # Validate observation pairs
+    is_valid, msg = validate_observation_pair(df_clean, sat)
+    if not is_valid:
+        return sat, None, msg
+
+    # Add time gap detection
+    if detect_gaps:
+        df_clean = add_time_gaps(df_clean, gap_threshold)
+        if float32:
+            df_clean['time_diff'] = df_clean['time_diff'].astype(np.float32)
+
+    return sat, df_clean, None
+
+
+def read_rinex(obs_file: str,
                systems: Optional[str] = None,
                min_epochs: int = 10,
                detect_gaps: bool = True,
                gap_threshold: float = 30.0,
-               verbose: bool = True) -> Dict[str, pd.DataFrame]:
+               verbose: bool = True,
+               as_frame: bool = False,
+               as_arrays: bool = False,
+               float32: bool = False,
+               float32_phase: bool = False,
+               cache: bool = True) -> Dict[str, pd.DataFrame]:
     """
     Read RINEX observation file (v2/v3/v4) - Robust for any RINEX file.
-    
+
     Args:
         obs_file: Path to RINEX observation file
         systems: Satellite systems to load ('G', 'R', 'E', 'C', 'GRE', etc.)
@@ -197,10 +293,34 @@ def read_rinex(obs_file: str,
         detect_gaps: Detect time gaps between epochs
         gap_threshold: Time gap threshold in seconds
         verbose: Print detailed information
-    
+        as_frame: Return one wide DataFrame indexed by (time, sv) instead
+                  of the per-satellite dict. The single-frame layout lets
+                  consumers replace per-satellite loops with grouped
+                  C-level reductions (see get_observation_summary).
+        as_arrays: Return Dict[sv → Dict[column → np.ndarray]] instead of
+                   per-satellite DataFrames: 'time' as datetime64[ns] and
+                   each observation column as a contiguous array.
+                   Numerical consumers index plain ndarrays with no
+                   pandas dispatch per access. Ignored when as_frame is
+                   set.
+        float32: Downcast observation columns (and time_diff) to float32,
+                 halving memory and the bandwidth of every later
+                 notna/diff/reduction pass. Pseudoranges keep their RINEX
+                 millimetre precision in float32; carrier-phase columns
+                 (~1e8 cycles, which would lose their fractional part)
+                 stay float64 unless float32_phase is also set.
+        float32_phase: With float32, downcast the carrier-phase (L*)
+                 columns too. Only safe when downstream processing does
+                 not rely on fractional-cycle phase.
+        cache: Load through the LRU + pickle-sidecar cache (see
+               rinex_cache), skipping RINEX text parsing on repeat reads
+               of an unchanged file. False forces a fresh georinex parse
+               and writes no sidecar.
+
     Returns:
         Dict[str, pd.DataFrame]: Satellite ID → DataFrame with observations
-    
+        (or one MultiIndex (time, sv) DataFrame when as_frame=True)
+
     Raises:
         FileNotFoundError: If file doesn't exist
         ValueError: If no valid satellites found
@@ -212,17 +332,15 @@ def read_rinex(obs_file: str,
     # 2. Detect RINEX version
     version = detect_rinex_version(obs_file)
     if verbose:
-        print(f"{'='*70}")
-        print(f"Loading RINEX file: {os.path.basename(obs_file)}")
-        print(f"RINEX Version: {version}")
-        print(f"{'='*70}")
+        logger.info("Loading RINEX file: %s (version %s)",
+                    os.path.basename(obs_file), version)
     
-    # 3. Load with georinex (handles all versions)
+    # 3. Load with georinex (handles all versions; LRU + sidecar cached)
     try:
-        if systems:
-            obs = gr.load(obs_file, use=systems)
+        if cache:
+            obs = load_rinex_cached(obs_file, systems)
         else:
-            obs = gr.load(obs_file)
+            obs = gr.load(obs_file, use=systems) if systems else gr.load(obs_file)
     except Exception as e:
         raise ValueError(f"Failed to load RINEX: {e}")
     
@@ -232,110 +350,186 @@ def read_rinex(obs_file: str,
         raise ValueError("No satellites found in RINEX file")
     
     if verbose:
-        print(f"Found {len(satellites)} satellites")
-    
-    # 5. Process each satellite
+        logger.info("Found %d satellites", len(satellites))
+    
+    # 5. Process each satellite. The Dataset is flattened to one DataFrame
+    # up front so the MultiIndex and block construction are paid once;
+    # per-satellite frames are then cheap C-level groupby slices instead of
+    # a sel().to_dataframe() materialization per satellite. The slices are
+    # independent, so they fan out over a thread pool — the heavy pieces
+    # (dropna, argsort, notna reductions) run in GIL-releasing C kernels.
     sat_dict: Dict[str, pd.DataFrame] = {}
     skipped = []
-    
-    for sat in satellites:
-        sat_data = obs.sel(sv=sat)
-        df = sat_data.to_dataframe().reset_index()
-        
-        # Standardize columns (RINEX 3→2)
-        df = standardize_columns(df, verbose=False)
-        
-        # Extract observation columns
-        obs_cols = [col for col in df.columns if col not in ['time', 'sv']]
-        if not obs_cols:
-            skipped.append((sat, "No observation columns"))
-            continue
-        
-        # Remove completely empty rows
-        df_clean = df[['time'] + obs_cols].dropna(subset=obs_cols, how='all')
-        
-        if len(df_clean) < min_epochs:
-            skipped.append((sat, f"Too few epochs ({len(df_clean)})"))
-            continue
-        
-        # Convert time
-        df_clean['time'] = pd.to_datetime(df_clean['time'])
-        df_clean = df_clean.sort_values('time').reset_index(drop=True)
-        
-        # Validate observation pairs
-        is_valid, msg = validate_observation_pair(df_clean, sat)
-        if not is_valid:
-            skipped.append((sat, msg))
+
+    big = obs.to_dataframe().reset_index()
+
+    # The time coordinate is the file-wide union, so every satellite's
+    # slice carries all-NaN rows for the epochs it was not observed at.
+    # Dropping them once here shrinks every group before the per-satellite
+    # pipeline instead of paying a dropna per satellite on full-union rows.
+    value_cols = big.columns.difference(['time', 'sv'])
+    big = big.dropna(subset=value_cols, how='all')
+
+    if float32:
+        cast_cols = (value_cols if float32_phase
+                     else [c for c in value_cols if not c.startswith('L')])
+        big[cast_cols] = big[cast_cols].astype(np.float32)
+
+    # Categorical sv: the split hashes each satellite label once and then
+    # groups on int8 codes instead of re-hashing an object string per row
+    big['sv'] = pd.Categorical(big['sv'])
+    groups = list(big.groupby('sv', sort=False, observed=True))
+
+    def process_one(item):
+        sat, df = item
+        return _process_satellite_frame(sat, df, min_epochs, detect_gaps,
+                                        gap_threshold, float32)
+
+    # groups can be empty when every observation row was all-NaN for the
+    # loaded systems; skip the pool (max_workers=0 is invalid) and let the
+    # final validation below raise the usual "no valid satellites" error.
+    if groups:
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(groups))) as ex:
+            results = list(ex.map(process_one, groups))
+    else:
+        results = []
+
+    for sat, df_clean, reason in results:
+        if df_clean is None:
+            skipped.append((sat, reason))
             continue
-        
-        # Add time gap detection
-        if detect_gaps:
-            df_clean = add_time_gaps(df_clean, gap_threshold)
-            n_gaps = df_clean['has_gap'].sum()
-            if n_gaps > 0 and verbose:
-                print(f"  {sat}: {n_gaps} gap(s) detected")
-        
-        # Store result
+
         sat_dict[sat] = df_clean
-        
-        if verbose:
+
+        if logger.isEnabledFor(logging.DEBUG):
+            if detect_gaps:
+                n_gaps = _n_true(df_clean['has_gap'])
+                if n_gaps > 0:
+                    logger.debug("%s: %d gap(s) detected", sat, n_gaps)
             obs_list = [col for col in df_clean.columns if col not in ['time', 'time_diff', 'has_gap']]
-            print(f"✓ {sat}: {len(df_clean)} epochs, obs: {obs_list}")
+            logger.debug("%s: %d epochs, obs: %s", sat, len(df_clean), obs_list)
     
-    # 6. Report skipped satellites
+    # 6. Report skipped satellites (details only at DEBUG)
     if verbose and skipped:
-        print(f"\n{'='*70}")
-        print(f"Skipped {len(skipped)} satellites:")
+        logger.info("Skipped %d satellites", len(skipped))
         for sat, reason in skipped:
-            print(f"  ⚠ {sat}: {reason}")
+            logger.debug("skipped %s: %s", sat, reason)
     
     # 7. Final validation
     if not sat_dict:
         raise ValueError("No satellites with valid L1/L2 + C1/C2 observations found")
     
     if verbose:
-        print(f"\n{'='*70}")
-        print(f"✓ Successfully loaded {len(sat_dict)} satellites")
-        print(f"{'='*70}\n")
-    
+        logger.info("Successfully loaded %d satellites", len(sat_dict))
+
+    if as_frame:
+        # Structure-of-arrays layout: one wide frame indexed by (time, sv),
+        # built once from the validated per-satellite frames
+        frame = pd.concat(sat_dict, names=['sv'])
+        frame = frame.set_index('time', append=True).droplevel(1)
+        return frame.swaplevel().sort_index()
+
+    if as_arrays:
+        return {sat: _frame_to_arrays(df) for sat, df in sat_dict.items()}
+
     return sat_dict
 
 
+def _frame_to_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    # Column-wise extraction: each observation lands as one contiguous
+    # ndarray ('time' stays datetime64[ns], 'has_gap' bool), dropping the
+    # frame's block manager and per-access pandas dispatch for numerical
+    # consumers.
+    return {col: np.ascontiguousarray(df[col].to_numpy()) for col in df.columns}
+
+
+def _n_true(s: pd.Series) -> int:
+    # Series.sum() on bool routes through pandas dispatch and casting;
+    # count_nonzero on the raw array is a single C call.
+    return int(np.count_nonzero(s.to_numpy()))
+
+
+def _summarize_frame(obs_df: pd.DataFrame) -> pd.DataFrame:
+    # Grouped reductions over the (time, sv) frame: every statistic is one
+    # C-level pass across all satellites instead of a per-satellite loop.
+    meta_cols = ['time_diff', 'has_gap']
+    obs_cols = [c for c in obs_df.columns if c not in meta_cols]
+
+    grouped = obs_df.groupby(level='sv', sort=False)
+    epochs = grouped.size()
+    times = obs_df.index.get_level_values('time').to_series(index=obs_df.index)
+    span_h = (times.groupby(level='sv', sort=False).max()
+              - times.groupby(level='sv', sort=False).min()).dt.total_seconds() / 3600
+    completeness = obs_df[obs_cols].notna().groupby(level='sv', sort=False).mean() * 100
+
+    summary = pd.DataFrame({'Satellite': epochs.index,
+                            'System': epochs.index.str[0],
+                            'Epochs': epochs.values,
+                            'Duration (h)': span_h.reindex(epochs.index).values})
+    if 'time_diff' in obs_df.columns:
+        sampling = obs_df['time_diff'].round().groupby(level='sv', sort=False).median()
+        summary['Sampling (s)'] = sampling.reindex(epochs.index).values
+    else:
+        summary['Sampling (s)'] = np.nan
+    if 'has_gap' in obs_df.columns:
+        summary['Gaps'] = grouped['has_gap'].sum().reindex(epochs.index).values
+    else:
+        summary['Gaps'] = 0
+    for obs in _SUMMARY_OBS:
+        col = (completeness[obs].reindex(epochs.index) if obs in completeness
+               else pd.Series(0.0, index=epochs.index))
+        summary[f'{obs} (%)'] = col.values
+    return summary.reset_index(drop=True)
+
+
+# Observables reported in the completeness columns of the summary
+_SUMMARY_OBS = ('L1', 'L2', 'C1', 'C2')
+
+_SUMMARY_COLUMNS = ['Satellite', 'System', 'Epochs', 'Duration (h)',
+                    'Sampling (s)', 'Gaps'] + [f'{o} (%)' for o in _SUMMARY_OBS]
+
+
 def get_observation_summary(sat_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-    """Generate summary table of loaded satellites."""
-    summary = []
-    
+    """
+    Generate summary table of loaded satellites.
+
+    Accepts either the per-satellite dict or the (time, sv) frame from
+    read_rinex(as_frame=True); the frame path computes every statistic as
+    one grouped reduction. Statistics stay numeric (unknown sampling is
+    NaN, not 'N/A') so callers can filter and sort on them; format at
+    print time, e.g. to_string(float_format='%.2f').
+    """
+    if isinstance(sat_dict, pd.DataFrame):
+        return _summarize_frame(sat_dict)
+
+    records = []
+
     for sat_id, df in sat_dict.items():
         system = sat_id[0] if len(sat_id) > 0 else 'G'
         n_epochs = len(df)
-        
+
         # Time span
         duration = (df['time'].max() - df['time'].min()).total_seconds() / 3600
-        
+
         # Sampling interval
-        sampling = df.attrs.get('sampling_interval', 'N/A')
-        
-        # Completeness
-        obs_types = [col for col in df.columns if col not in ['time', 'time_diff', 'has_gap', 'sv']]
-        completeness = {obs: (df[obs].notna().sum() / n_epochs * 100) for obs in obs_types}
-        
+        sampling = df.attrs.get('sampling_interval', np.nan)
+
+        # Completeness: one notna matrix over just the reported observables
+        # instead of a dict comprehension across every column
+        cols = frozenset(df.columns)
+        present = [c for c in _SUMMARY_OBS if c in cols]
+        pct = dict(zip(present,
+                       df[present].notna().to_numpy().mean(axis=0) * 100))
+
         # Gaps
-        n_gaps = df['has_gap'].sum() if 'has_gap' in df.columns else 0
-        
-        summary.append({
-            'Satellite': sat_id,
-            'System': system,
-            'Epochs': n_epochs,
-            'Duration (h)': f"{duration:.2f}",
-            'Sampling (s)': f"{sampling:.1f}" if isinstance(sampling, (int, float)) else 'N/A',
-            'Gaps': n_gaps,
-            'L1 (%)': f"{completeness.get('L1', 0):.1f}",
-            'L2 (%)': f"{completeness.get('L2', 0):.1f}",
-            'C1 (%)': f"{completeness.get('C1', 0):.1f}",
-            'C2 (%)': f"{completeness.get('C2', 0):.1f}",
-        })
-    
-    return pd.DataFrame(summary)
+        n_gaps = _n_true(df['has_gap']) if 'has_gap' in df.columns else 0
+
+        records.append((sat_id, system, n_epochs, duration, sampling, n_gaps)
+                       + tuple(pct.get(o, 0.0) for o in _SUMMARY_OBS))
+
+    # Fixed schema: from_records skips per-dict key alignment and dtype
+    # re-inference, and the column order is stable even for empty input
+    return pd.DataFrame.from_records(records, columns=_SUMMARY_COLUMNS)
 
 
 if __name__ == "__main__":
@@ -345,6 +539,6 @@ if __name__ == "__main__":
     if os.path.exists(test_file):
         sat_dict = read_rinex(test_file, systems='G')
         summary = get_observation_summary(sat_dict)
-        print(summary.to_string(index=False))
+        print(summary.to_string(index=False, float_format='%.2f'))
     else:
         print("Test file not found. Provide RINEX file path.")
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Module: rinex_cache.py
+
+Description:
+Caching layer over georinex file loads, shared by the navigation and
+observation readers. Parsing a RINEX file is usually the dominant cost of
+the pipeline, so loads are memoized in-process with an LRU keyed by
+(path, mtime, systems) and persisted across processes through a pickle
+sidecar next to the source file. The sidecar is only trusted while it is
+at least as new as the RINEX file, so editing the file invalidates both
+layers.
+
+Author: F.Ahmadzade
+"""
+
+import functools
+import os
+import pickle
+
+
+def _sidecar_path(path: str, systems) -> str:
+    tag = systems if systems else 'all'
+    return f"{path}.{tag}.pkl"
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(abspath: str, mtime_ns: int, systems):
+    # mtime_ns participates in the key so a changed file on disk gets a
+    # fresh parse; the Dataset is shared, so callers must not mutate it.
+    sidecar = _sidecar_path(abspath, systems)
+    try:
+        if os.stat(sidecar).st_mtime_ns >= mtime_ns:
+            with open(sidecar, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass  # missing/stale/corrupt sidecar: fall through to a full parse
+
+    import georinex as gr
+    data = gr.load(abspath, use=systems) if systems else gr.load(abspath)
+
+    try:
+        with open(sidecar, 'wb') as f:
+            pickle.dump(data, f, protocol=5)
+    except OSError:
+        pass  # read-only location: in-process LRU still applies
+    return data
+
+
+def load_rinex_cached(path: str, systems=None):
+    """
+    Load a RINEX file through georinex with LRU + pickle-sidecar caching.
+
+    Args:
+        path: Path to RINEX navigation or observation file.
+        systems: Satellite systems filter passed to gr.load ('G', 'GRE', ...);
+                 None loads all systems.
+
+    Returns:
+        xarray Dataset, possibly shared with other callers — treat as
+        read-only.
+    """
+    abspath = os.path.abspath(path)
+    return _load_cached(abspath, os.stat(abspath).st_mtime_ns, systems)
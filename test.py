@@ -5,7 +5,8 @@ nav_path = "Data/brdc2580.21n"
 prn_id = "G05"
 obs_time = pd.Timestamp("2021-09-15 00:00:00")
 
-df = process_prn(nav_path, prn_id, obs_time=obs_time, save_csv=True, show_plot=True)
+df = process_prn(nav_path, prn_id, obs_time=obs_time, save_csv=True, show_plot=True,
+                 as_dataframe=True)
 
 if df is not None:
     print(df.head())